@@ -8,8 +8,11 @@ import (
   "io"
   "log"
   "os"
+  "os/signal"
   "path/filepath"
   "strings"
+  "sync"
+  "syscall"
   "time"
 
   "github.com/tuya/tuya-connector-go/connector"
@@ -23,12 +26,23 @@ var (
   BuildDate = "unknown"
 )
 
+const (
+  envAccessID      = "TUYA_ACCESS_ID"
+  envAccessKey     = "TUYA_ACCESS_KEY"
+  envRegion        = "TUYA_REGION"
+  envDeviceID      = "TUYA_DEVICE_ID"
+  envShutdownDelay = "SHUTDOWN_DELAY"
+  envPollInterval  = "POLL_INTERVAL"
+  envDebug         = "DEBUG"
+)
+
 type Config struct {
   AccessID       string
   AccessKey      string
   Region         string
   DeviceID       string
   ShutdownDelay  time.Duration
+  PollInterval   time.Duration
   Debug          bool
 }
 
@@ -70,6 +84,60 @@ type DeviceCmdResponse struct {
   T       int64  `json:"t"`
 }
 
+type DeviceCommand struct {
+  Code  string `json:"code"`
+  Value bool   `json:"value"`
+}
+
+type DeviceCmdRequest struct {
+  Commands []DeviceCommand `json:"commands"`
+}
+
+// logLookback is how far back getLastDeviceLogs looks for device logs.
+const logLookback = 10 * time.Minute
+
+// logDpIds are the data points requested from the device log API.
+const logDpIds = "1,2,3,4,5,6,7,8,9"
+
+type controlStep struct {
+  Name     string
+  Payload  []byte
+  Wait     time.Duration
+  DebugMsg string
+}
+
+// controlSteps is the reset sequence sent by controlDevice. Payloads are
+// marshalled once at startup since they never change.
+var controlSteps = []controlStep{
+  {
+    Name:     "OFF",
+    Payload:  mustMarshalCommand("switch", false),
+    Wait:     1 * time.Second,
+    DebugMsg: "Device turned OFF, waiting 1 second...",
+  },
+  {
+    Name:     "ON",
+    Payload:  mustMarshalCommand("switch", true),
+    Wait:     2 * time.Second,
+    DebugMsg: "Device turned ON, waiting 2 seconds...",
+  },
+  {
+    Name:     "CLEAN",
+    Payload:  mustMarshalCommand("manual_clean", true),
+    DebugMsg: "Clean command sent",
+  },
+}
+
+func mustMarshalCommand(code string, value bool) []byte {
+  payload, err := json.Marshal(DeviceCmdRequest{
+    Commands: []DeviceCommand{{Code: code, Value: value}},
+  })
+  if err != nil {
+    panic(err)
+  }
+  return payload
+}
+
 func loadEnvFile(filepath string) error {
   file, err := os.Open(filepath)
   if err != nil {
@@ -93,14 +161,36 @@ func loadEnvFile(filepath string) error {
   return scanner.Err()
 }
 
+// findEnvFile looks for .env in the working directory first, then next to
+// the executable.
+func findEnvFile() (string, bool) {
+  envPath := ".env"
+  if _, err := os.Stat(envPath); err == nil {
+    return envPath, true
+  }
+
+  exePath, err := os.Executable()
+  if err != nil {
+    return "", false
+  }
+
+  envPath = filepath.Join(filepath.Dir(exePath), ".env")
+  if _, err := os.Stat(envPath); err == nil {
+    return envPath, true
+  }
+
+  return "", false
+}
+
 func loadConfig() (*Config, error) {
   cfg := &Config{
-    AccessID:      os.Getenv("TUYA_ACCESS_ID"),
-    AccessKey:     os.Getenv("TUYA_ACCESS_KEY"),
-    Region:        os.Getenv("TUYA_REGION"),
-    DeviceID:      os.Getenv("TUYA_DEVICE_ID"),
+    AccessID:      os.Getenv(envAccessID),
+    AccessKey:     os.Getenv(envAccessKey),
+    Region:        os.Getenv(envRegion),
+    DeviceID:      os.Getenv(envDeviceID),
     ShutdownDelay: 0,
-    Debug:         os.Getenv("DEBUG") == "true",
+    PollInterval:  30 * time.Second,
+    Debug:         os.Getenv(envDebug) == "true",
   }
 
   if cfg.AccessID == "" || cfg.AccessKey == "" || cfg.DeviceID == "" {
@@ -115,7 +205,7 @@ func loadConfig() (*Config, error) {
     return nil, fmt.Errorf("invalid region: %s (valid: eu, us, cn, in)", cfg.Region)
   }
 
-  shutdownDelayStr := os.Getenv("SHUTDOWN_DELAY")
+  shutdownDelayStr := os.Getenv(envShutdownDelay)
   if shutdownDelayStr != "" {
     duration, err := time.ParseDuration(shutdownDelayStr)
     if err != nil {
@@ -124,19 +214,31 @@ func loadConfig() (*Config, error) {
     cfg.ShutdownDelay = duration
   }
 
+  pollIntervalStr := os.Getenv(envPollInterval)
+  if pollIntervalStr != "" {
+    duration, err := time.ParseDuration(pollIntervalStr)
+    if err != nil {
+      return nil, fmt.Errorf("invalid POLL_INTERVAL: %w", err)
+    }
+    if duration <= 0 {
+      return nil, fmt.Errorf("invalid POLL_INTERVAL: must be positive")
+    }
+    cfg.PollInterval = duration
+  }
+
   return cfg, nil
 }
 
-func getDeviceStatus(deviceID string) (*DeviceInfoResponse, error) {
+func getDeviceInfo(uri string, what string) (*DeviceInfoResponse, error) {
   resp := &DeviceInfoResponse{}
   err := connector.MakeGetRequest(
     context.Background(),
-    connector.WithAPIUri(fmt.Sprintf("/v1.0/devices/%s", deviceID)),
+    connector.WithAPIUri(uri),
     connector.WithResp(resp),
   )
 
   if err != nil {
-    return nil, fmt.Errorf("failed to get device status: %w", err)
+    return nil, fmt.Errorf("failed to get %s: %w", what, err)
   }
 
   if !resp.Success {
@@ -146,25 +248,20 @@ func getDeviceStatus(deviceID string) (*DeviceInfoResponse, error) {
   return resp, nil
 }
 
+func getDeviceStatus(deviceID string) (*DeviceInfoResponse, error) {
+  return getDeviceInfo(fmt.Sprintf("/v1.0/devices/%s", deviceID), "device status")
+}
+
 func getLastDeviceLogs(deviceID string) ([]interface{}, error) {
   now := time.Now().UnixMilli()
-  startTime := now - (10 * 60 * 1000)
+  startTime := now - logLookback.Milliseconds()
 
-  dpIds := "1,2,3,4,5,6,7,8,9"
-
-  resp := &DeviceInfoResponse{}
-  err := connector.MakeGetRequest(
-    context.Background(),
-    connector.WithAPIUri(fmt.Sprintf("/v2.0/cloud/thing/%s/logs?query_type=1&type=%s&start_time=%d&end_time=%d", deviceID, dpIds, startTime, now)),
-    connector.WithResp(resp),
+  resp, err := getDeviceInfo(
+    fmt.Sprintf("/v2.0/cloud/thing/%s/logs?query_type=1&type=%s&start_time=%d&end_time=%d", deviceID, logDpIds, startTime, now),
+    "device logs",
   )
-
   if err != nil {
-    return nil, fmt.Errorf("failed to get device logs: %w", err)
-  }
-
-  if !resp.Success {
-    return nil, fmt.Errorf("API returned success=false: %s", resp.Msg)
+    return nil, err
   }
 
   if logs, ok := resp.Result["logs"].([]interface{}); ok && len(logs) > 0 {
@@ -196,101 +293,162 @@ func needsReset(deviceInfo *DeviceInfoResponse, lastLogs []interface{}) bool {
 }
 
 func controlDevice(deviceID string, debug bool, appLog *log.Logger) error {
-  commandsOff := map[string]interface{}{
-    "commands": []map[string]interface{}{
-      {
-        "code":  "switch",
-        "value": false,
-      },
-    },
-  }
+  commandsURI := fmt.Sprintf("/v1.0/devices/%s/commands", deviceID)
 
-  payloadOff, _ := json.Marshal(commandsOff)
+  for _, step := range controlSteps {
+    resp := &DeviceCmdResponse{}
+    err := connector.MakePostRequest(
+      context.Background(),
+      connector.WithAPIUri(commandsURI),
+      connector.WithPayload(step.Payload),
+      connector.WithResp(resp),
+    )
 
-  respOff := &DeviceCmdResponse{}
-  err := connector.MakePostRequest(
-    context.Background(),
-    connector.WithAPIUri(fmt.Sprintf("/v1.0/devices/%s/commands", deviceID)),
-    connector.WithPayload(payloadOff),
-    connector.WithResp(respOff),
-  )
+    if err != nil {
+      return fmt.Errorf("failed to send %s command: %w", step.Name, err)
+    }
 
-  if err != nil {
-    return fmt.Errorf("failed to send OFF command: %w", err)
-  }
+    if !resp.Success {
+      return fmt.Errorf("%s command failed: %s", step.Name, resp.Msg)
+    }
 
-  if !respOff.Success {
-    return fmt.Errorf("OFF command failed: %s", respOff.Msg)
+    if debug {
+      appLog.Println(step.DebugMsg)
+    }
+    if step.Wait > 0 {
+      time.Sleep(step.Wait)
+    }
   }
 
-  if debug {
-    appLog.Println("Device turned OFF, waiting 1 second...")
+  return nil
+}
+
+var (
+  logLocationOnce sync.Once
+  logLocationTZ   *time.Location
+)
+
+// logLocation loads the timezone used for readable log timestamps once, so
+// daemon mode does not re-read tzdata on every check.
+func logLocation() *time.Location {
+  logLocationOnce.Do(func() {
+    loc, err := time.LoadLocation("Europe/Amsterdam")
+    if err != nil {
+      loc = time.UTC
+    }
+    logLocationTZ = loc
+  })
+  return logLocationTZ
+}
+
+func logsSince(logs []interface{}, since time.Time) []interface{} {
+  var recent []interface{}
+  for _, logEntry := range logs {
+    if logMap, ok := logEntry.(map[string]interface{}); ok {
+      if eventTime, ok := logMap["event_time"].(float64); ok && int64(eventTime) > since.UnixMilli() {
+        recent = append(recent, logEntry)
+      }
+    }
   }
-  time.Sleep(1 * time.Second)
+  return recent
+}
 
-  commandsOn := map[string]interface{}{
-    "commands": []map[string]interface{}{
-      {
-        "code":  "switch",
-        "value": true,
-      },
-    },
+// runOnce checks the device and resets it if needed. lastReset is nil for
+// one-shot runs; daemon mode passes the time of its last reset so the same
+// log entries do not trigger another reset on the next check.
+func runOnce(cfg *Config, appLog *log.Logger, lastReset *time.Time) error {
+  deviceStatus, err := getDeviceStatus(cfg.DeviceID)
+  if err != nil {
+    return err
   }
 
-  payloadOn, _ := json.Marshal(commandsOn)
+  if cfg.Debug {
+    appLog.Println("========== DEVICE STATUS ==========")
+    appLog.Printf("Online: %v\n", deviceStatus.Result["online"])
 
-  respOn := &DeviceCmdResponse{}
-  err = connector.MakePostRequest(
-    context.Background(),
-    connector.WithAPIUri(fmt.Sprintf("/v1.0/devices/%s/commands", deviceID)),
-    connector.WithPayload(payloadOn),
-    connector.WithResp(respOn),
-  )
+    if statusArray, ok := deviceStatus.Result["status"].([]interface{}); ok {
+      for _, item := range statusArray {
+        if statusItem, ok := item.(map[string]interface{}); ok {
+          code := statusItem["code"]
+          value := statusItem["value"]
+          appLog.Printf("  %-25s = %-15v (type: %T)", code, value, value)
+        }
+      }
+    }
+    appLog.Println("===================================")
+  }
 
+  lastLogs, err := getLastDeviceLogs(cfg.DeviceID)
   if err != nil {
-    return fmt.Errorf("failed to send ON command: %w", err)
+    if cfg.Debug {
+      appLog.Printf("\nWarning: Failed to get device logs: %v\n", err)
+    }
   }
-
-  if !respOn.Success {
-    return fmt.Errorf("ON command failed: %s", respOn.Msg)
+  if len(lastLogs) > 0 && cfg.Debug {
+    appLog.Println("\n========== LAST 5 LOGS ==========")
+    amsterdamTZ := logLocation()
+    for _, logEntry := range lastLogs {
+      if logMap, ok := logEntry.(map[string]interface{}); ok {
+        if eventTime, ok := logMap["event_time"].(float64); ok {
+          dt := time.Unix(int64(eventTime)/1000, 0).In(amsterdamTZ)
+          logMap["event_time_readable"] = dt.Format("2006-01-02 15:04:05")
+        }
+      }
+    }
+    enc := json.NewEncoder(appLog.Writer())
+    enc.SetIndent("", "  ")
+    enc.Encode(lastLogs)
+    appLog.Println("=================================")
   }
 
-  if debug {
-    appLog.Println("Device turned ON, waiting 2 seconds...")
+  // In daemon mode the logs that caused the last reset stay inside the
+  // lookback window for a while, so only act on entries logged after it.
+  resetLogs := lastLogs
+  recentlyReset := lastReset != nil && time.Since(*lastReset) < logLookback
+  if recentlyReset {
+    resetLogs = logsSince(lastLogs, *lastReset)
   }
-  time.Sleep(2 * time.Second)
 
-  commandsClean := map[string]interface{}{
-    "commands": []map[string]interface{}{
-      {
-        "code":  "manual_clean",
-        "value": true,
-      },
-    },
+  if (!recentlyReset || len(resetLogs) > 0) && needsReset(deviceStatus, resetLogs) {
+    appLog.Println("Device needs reset, sending control command...")
+    if err := controlDevice(cfg.DeviceID, cfg.Debug, appLog); err != nil {
+      return fmt.Errorf("failed to control device: %w", err)
+    }
+    appLog.Println("Control command sent successfully")
+    if lastReset != nil {
+      *lastReset = time.Now()
+    }
+  } else if lastReset == nil || cfg.Debug {
+    appLog.Println("Device is working properly, no action needed")
   }
 
-  payloadClean, _ := json.Marshal(commandsClean)
+  return nil
+}
 
-  respClean := &DeviceCmdResponse{}
-  err = connector.MakePostRequest(
-    context.Background(),
-    connector.WithAPIUri(fmt.Sprintf("/v1.0/devices/%s/commands", deviceID)),
-    connector.WithPayload(payloadClean),
-    connector.WithResp(respClean),
-  )
+func runDaemon(cfg *Config, appLog *log.Logger) {
+  ctx, stop := signal.NotifyContext(context.Background(), os.Interrupt, syscall.SIGTERM)
+  defer stop()
 
-  if err != nil {
-    return fmt.Errorf("failed to send CLEAN command: %w", err)
-  }
+  ticker := time.NewTicker(cfg.PollInterval)
+  defer ticker.Stop()
+
+  var lastReset time.Time
 
-  if !respClean.Success {
-    return fmt.Errorf("CLEAN command failed: %s", respClean.Msg)
+  if cfg.Debug {
+    appLog.Printf("Running in daemon mode, checking every %s\n", cfg.PollInterval)
   }
 
-  if debug {
-    appLog.Println("Clean command sent")
+  for {
+    if err := runOnce(cfg, appLog, &lastReset); err != nil {
+      appLog.Printf("Failed to check device: %v\n", err)
+    }
+
+    select {
+    case <-ctx.Done():
+      return
+    case <-ticker.C:
+    }
   }
-  return nil
 }
 
 func main() {
@@ -299,22 +457,12 @@ func main() {
     os.Exit(0)
   }
 
-  envPath := ".env"
-  if _, err := os.Stat(envPath); err == nil {
+  daemon := len(os.Args) > 1 && os.Args[1] == "daemon"
+
+  if envPath, ok := findEnvFile(); ok {
     if err := loadEnvFile(envPath); err != nil {
       log.Printf("Warning: Failed to load .env file: %v", err)
     }
-  } else {
-    exePath, err := os.Executable()
-    if err == nil {
-      exeDir := filepath.Dir(exePath)
-      envPath = filepath.Join(exeDir, ".env")
-      if _, err := os.Stat(envPath); err == nil {
-        if err := loadEnvFile(envPath); err != nil {
-          log.Printf("Warning: Failed to load .env file: %v", err)
-        }
-      }
-    }
   }
 
   cfg, err := loadConfig()
@@ -322,14 +470,12 @@ func main() {
     log.Fatalf("Failed to load config: %v", err)
   }
 
-  var appLog *log.Logger
+  appLog := log.New(os.Stdout, "", 0)
   if !cfg.Debug {
     log.SetOutput(io.Discard)
     logger.Log.SetLevel(999)
-    appLog = log.New(os.Stdout, "", 0)
   } else {
     log.SetFlags(0)
-    appLog = log.New(os.Stdout, "", 0)
   }
 
   region := regionConfig[cfg.Region]
@@ -341,57 +487,13 @@ func main() {
     env.WithMsgHost(region.MsgHost),
   )
 
-  deviceStatus, err := getDeviceStatus(cfg.DeviceID)
-  if err != nil {
-    log.Fatalf("Failed to get device status: %v", err)
-  }
-
-  if cfg.Debug {
-    appLog.Println("========== DEVICE STATUS ==========")
-    appLog.Printf("Online: %v\n", deviceStatus.Result["online"])
-
-    if statusArray, ok := deviceStatus.Result["status"].([]interface{}); ok {
-      for _, item := range statusArray {
-        if statusItem, ok := item.(map[string]interface{}); ok {
-          code := statusItem["code"]
-          value := statusItem["value"]
-          appLog.Printf("  %-25s = %-15v (type: %T)", code, value, value)
-        }
-      }
-    }
-    appLog.Println("===================================")
-  }
-
-  lastLogs, err := getLastDeviceLogs(cfg.DeviceID)
-  if err != nil {
-    if cfg.Debug {
-      appLog.Printf("\nWarning: Failed to get device logs: %v\n", err)
-    }
-  }
-  if len(lastLogs) > 0 && cfg.Debug {
-    appLog.Println("\n========== LAST 5 LOGS ==========")
-    amsterdamTZ, _ := time.LoadLocation("Europe/Amsterdam")
-    for _, logEntry := range lastLogs {
-      if logMap, ok := logEntry.(map[string]interface{}); ok {
-        if eventTime, ok := logMap["event_time"].(float64); ok {
-          dt := time.Unix(int64(eventTime)/1000, 0).In(amsterdamTZ)
-          logMap["event_time_readable"] = dt.Format("2006-01-02 15:04:05")
-        }
-      }
-    }
-    logsJSON, _ := json.MarshalIndent(lastLogs, "", "  ")
-    appLog.Println(string(logsJSON))
-    appLog.Println("=================================")
+  if daemon {
+    runDaemon(cfg, appLog)
+    return
   }
 
-  if needsReset(deviceStatus, lastLogs) {
-    appLog.Println("Device needs reset, sending control command...")
-    if err := controlDevice(cfg.DeviceID, cfg.Debug, appLog); err != nil {
-      log.Fatalf("Failed to control device: %v", err)
-    }
-    appLog.Println("Control command sent successfully")
-  } else {
-    appLog.Println("Device is working properly, no action needed")
+  if err := runOnce(cfg, appLog, nil); err != nil {
+    log.Fatalf("Failed to check device: %v", err)
   }
 
   if cfg.ShutdownDelay > 0 {